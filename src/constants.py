@@ -1,4 +1,9 @@
-import pytz
+import sys
+from datetime import timedelta, timezone
 
-# Définition de la timezone MEZ/MESZ (Europe/Berlin)
-MEZ_TIMEZONE = pytz.timezone("Europe/Berlin")
+# Décalage fixe de l'heure normale (MEZ) par rapport à UTC
+MEZ_OFFSET = timezone(timedelta(hours=1))
+
+# Les points de données sont créés par milliers: sans __dict__ ils sont plus compacts
+# (option `slots` des dataclasses, disponible à partir de Python 3.10)
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -10,15 +10,69 @@ Ce module contient la logique principale pour:
 
 from __future__ import annotations
 
+import itertools
 import logging
+from dataclasses import dataclass
+from datetime import datetime
 from parser import SolarParser, WeatherParser
 from pathlib import Path
 
 from preview import AdjustmentSample, PreviewData
+from solar import SolarPoint
+from weather import WeatherPoint
 
 logger = logging.getLogger(__name__)
 
 
+def _utc_hour(utc_dt: datetime) -> int:
+    """Numéro d'heure UTC absolu, commun aux données météo et solaires."""
+    return utc_dt.toordinal() * 24 + utc_dt.hour
+
+
+def _format_weather_line(raw_line: str, temperature: float) -> str:
+    """Remplace la température (colonnes 26-30) en préservant le reste de la ligne."""
+    return raw_line[:25] + f"{temperature:.1f}".rjust(5) + raw_line[25 + 5 :]
+
+
+@dataclass
+class SolarIndex:
+    """Index dense des points solaires: une case par heure UTC depuis `first_hour`."""
+
+    first_hour: int
+    points: list[SolarPoint | None]
+
+
+# Irradiance des heures sans donnée solaire: aucun seuil ne déclenche d'ajustement
+NO_IRRADIANCE = float("-inf")
+
+
+@dataclass
+class AlignedSolarData:
+    """Données solaires alignées sur les points météo, rangées par colonnes.
+
+    L'indice `i` de chaque liste correspond à `weather_data[i]`.
+    """
+
+    weather_datetimes_utc: list[datetime]
+    solar_points: list[SolarPoint | None]
+    irradiance_by_facade: dict[str, list[float]]
+
+
+@dataclass
+class ParsedInputs:
+    """Fichiers météo et solaire parsés, réutilisables pour plusieurs prévisualisations.
+
+    L'année des points météo est déjà celle du fichier solaire; les prévisualisations
+    construites à partir de ces données les partagent et ne doivent pas les modifier.
+    """
+
+    weather_file: str
+    solar_file: str
+    weather_header: str
+    weather_data: list[WeatherPoint]
+    solar_data: list[SolarPoint]
+
+
 class SoschuProcessor:
     """Processeur principal pour les ajustements de température."""
 
@@ -26,17 +80,111 @@ class SoschuProcessor:
         self.weather_parser = WeatherParser()
         self.solar_parser = SolarParser()
 
-    def preview_adjustments(
-        self, weather_file: str, solar_file: str, threshold: float, delta_t: float
-    ) -> PreviewData:
-        """Génère la prévisualisation des ajustements."""
+    def _create_solar_index(self, solar_data: list[SolarPoint]) -> SolarIndex:
+        """Indexe les points solaires par heure UTC dans une liste dense."""
+        hours = [point.utc_hour for point in solar_data]
+        if not hours:
+            return SolarIndex(first_hour=0, points=[])
+
+        first_hour = min(hours)
+        points: list[SolarPoint | None] = [None] * (max(hours) - first_hour + 1)
+        for hour, point in zip(hours, solar_data):
+            points[hour - first_hour] = point
+
+        return SolarIndex(first_hour=first_hour, points=points)
+
+    def _get_solar_point_for_datetime(
+        self, solar_index: SolarIndex, utc_dt: datetime
+    ) -> SolarPoint | None:
+        """Renvoie le point solaire correspondant à une date/heure UTC, s'il existe."""
+        offset = _utc_hour(utc_dt) - solar_index.first_hour
+        if 0 <= offset < len(solar_index.points):
+            return solar_index.points[offset]
+        return None
+
+    def _align_solar_data(
+        self,
+        weather_data: list[WeatherPoint],
+        solar_data: list[SolarPoint],
+        facades: list[str],
+    ) -> AlignedSolarData:
+        """Associe à chaque point météo son point solaire et l'irradiance par façade."""
+        solar_index = self._create_solar_index(solar_data)
+
+        weather_datetimes_utc = [point.to_datetime_utc() for point in weather_data]
+        solar_points = [
+            self._get_solar_point_for_datetime(solar_index, utc_dt)
+            for utc_dt in weather_datetimes_utc
+        ]
+        irradiance_by_facade = {
+            facade: [
+                NO_IRRADIANCE
+                if solar_point is None
+                else solar_point.irradiance_by_facade.get(facade, 0.0)
+                for solar_point in solar_points
+            ]
+            for facade in facades
+        }
 
-        # Parser les fichiers
+        return AlignedSolarData(
+            weather_datetimes_utc=weather_datetimes_utc,
+            solar_points=solar_points,
+            irradiance_by_facade=irradiance_by_facade,
+        )
+
+    def _select_spaced_indices(
+        self,
+        available_indices: list[int],
+        weather_datetimes_utc: list[datetime],
+        max_samples: int,
+    ) -> list[int]:
+        """
+        Choisit au plus `max_samples` heures bien espacées parmi les heures ajustées,
+        si possible sur des jours différents.
+        """
+
+        def day_key(i: int) -> tuple[int, int]:
+            return weather_datetimes_utc[i].month, weather_datetimes_utc[i].day
+
+        # Trier les ajustements par date/heure
+        available_indices = sorted(
+            available_indices, key=lambda i: (*day_key(i), weather_datetimes_utc[i].hour)
+        )
+
+        # Pour garantir des exemples bien espacés, on essaie de prendre des échantillons de différentes parties de l'année
+        if len(available_indices) <= max_samples:
+            # Si nous avons peu d'échantillons, prenons-les tous
+            selected_indices = available_indices
+        else:
+            # Diviser l'ensemble des ajustements en segments et prendre un échantillon au milieu de chaque segment
+            segment_size = len(available_indices) // max_samples
+            selected_indices = [
+                available_indices[k * segment_size + segment_size // 2] for k in range(max_samples)
+            ]
+
+        # Vérifier que les échantillons sont suffisamment espacés (différents jours si possible)
+        final_indices = []
+        used_days = set()
+
+        for i in selected_indices:
+            # Si ce jour est déjà utilisé et qu'on a d'autres options, chercher un autre jour
+            if day_key(i) in used_days and len(final_indices) < len(available_indices):
+                i = next(
+                    (alt for alt in available_indices if day_key(alt) not in used_days),
+                    i,
+                )
+
+            used_days.add(day_key(i))
+            final_indices.append(i)
+
+        return final_indices
+
+    def load_inputs(self, weather_file: str, solar_file: str) -> ParsedInputs:
+        """Parse les fichiers et applique l'année du fichier solaire aux données météo."""
         weather_header, weather_data = self.weather_parser.parse(weather_file)
         solar_data = self.solar_parser.parse(solar_file)
 
         # Récupérer l'année depuis les données solaires (si disponible)
-        year_from_solar = 2045  # Valeur par défaut
         if solar_data and hasattr(solar_data[0], "year"):
             year_from_solar = solar_data[0].year
             logger.info(f"Année extraite du fichier solar: {year_from_solar}")
@@ -45,160 +193,149 @@ class SoschuProcessor:
             for weather_point in weather_data:
                 weather_point.year = year_from_solar
 
-        # Créer un index des données solaires pour un accès rapide (basé sur UTC)
-        solar_index = {}
-        for solar_point in solar_data:
-            # Convertir en UTC pour la comparaison
-            utc_dt = solar_point.to_datetime_utc()
-            key = (utc_dt.year, utc_dt.month, utc_dt.day, utc_dt.hour, utc_dt.minute)
-            solar_index[key] = solar_point
+        return ParsedInputs(
+            weather_file=weather_file,
+            solar_file=solar_file,
+            weather_header=weather_header,
+            weather_data=weather_data,
+            solar_data=solar_data,
+        )
 
+    def preview_adjustments(
+        self, weather_file: str, solar_file: str, threshold: float, delta_t: float
+    ) -> PreviewData:
+        """Génère la prévisualisation des ajustements."""
+        return self.preview_adjustments_batch(weather_file, solar_file, [threshold], [delta_t])[0]
+
+    def preview_adjustments_batch(
+        self,
+        weather_file: str,
+        solar_file: str,
+        thresholds: list[float],
+        delta_ts: list[float],
+    ) -> list[PreviewData]:
+        """
+        Génère une prévisualisation par combinaison (seuil, delta T), dans l'ordre de
+        `itertools.product(thresholds, delta_ts)`.
+
+        Les fichiers ne sont parsés et alignés qu'une seule fois pour toutes les
+        combinaisons; les prévisualisations partagent les mêmes données météo et
+        solaires.
+        """
+        return self.preview_adjustments_from_parsed(
+            self.load_inputs(weather_file, solar_file), thresholds, delta_ts
+        )
+
+    def preview_adjustments_from_parsed(
+        self, inputs: ParsedInputs, thresholds: list[float], delta_ts: list[float]
+    ) -> list[PreviewData]:
+        """
+        Comme `preview_adjustments_batch`, à partir de fichiers déjà parsés par
+        `load_inputs`: aucun fichier n'est relu.
+        """
         # Calculer les ajustements
         facades = []
-        if solar_data:
-            facades = list(solar_data[0].irradiance_by_facade.keys())
-
-        adjustments_by_facade = dict.fromkeys(facades, 0)
-        total_adjustments = 0
+        if inputs.solar_data:
+            facades = list(inputs.solar_data[0].irradiance_by_facade.keys())
+
+        # Aligner les données solaires sur les données météo (basé sur UTC)
+        aligned = self._align_solar_data(inputs.weather_data, inputs.solar_data, facades)
+
+        return [
+            self._build_preview(
+                inputs=inputs,
+                aligned=aligned,
+                facades=facades,
+                threshold=threshold,
+                delta_t=delta_t,
+            )
+            for threshold, delta_t in itertools.product(thresholds, delta_ts)
+        ]
+
+    def _build_preview(
+        self,
+        *,
+        inputs: ParsedInputs,
+        aligned: AlignedSolarData,
+        facades: list[str],
+        threshold: float,
+        delta_t: float,
+    ) -> PreviewData:
+        """Calcule les ajustements d'un couple (seuil, delta T) sur les données alignées."""
+        weather_data = inputs.weather_data
+        # Filtrer chaque colonne d'irradiance en une seule passe: indices des heures
+        # ajustées (les heures sans donnée solaire valent NO_IRRADIANCE)
+        adjusted_indices_by_facade = {
+            facade: [i for i, irradiance in enumerate(column) if irradiance > threshold]
+            for facade, column in aligned.irradiance_by_facade.items()
+        }
+        adjustments_by_facade = {
+            facade: len(indices) for facade, indices in adjusted_indices_by_facade.items()
+        }
+        total_adjustments = sum(adjustments_by_facade.values())
 
         max_samples_per_type = 3
-        all_adjustments_by_facade_season = {
-            facade: {"winter": [], "summer": []} for facade in facades
-        }
+        weather_datetimes_utc = aligned.weather_datetimes_utc
 
         logger.info("Collecte des exemples d'ajustements pour prévisualisation...")
 
-        # Premier passage: collecter tous les ajustements possibles
-        for weather_point in weather_data:
-            # Convertir en UTC pour la comparaison
-            utc_dt = weather_point.to_datetime_utc()
-            key = (utc_dt.year, utc_dt.month, utc_dt.day, utc_dt.hour, utc_dt.minute)
-
-            if key in solar_index:
-                solar_point = solar_index[key]
-
-                for facade, irradiance in solar_point.irradiance_by_facade.items():
-                    if irradiance > threshold:
-                        adjustments_by_facade[facade] += 1
-                        total_adjustments += 1
-
-                        # Formats date/heure dans leurs formats originaux respectifs
-                        weather_datetime_str = (
-                            weather_point.get_original_datetime_str()
-                        )  # Format 1-24 MEZ
-                        solar_datetime_str = (
-                            solar_point.get_original_datetime_str()
-                        )  # Format 0-23 MEZ/MESZ
-
-                        # Format commun pour affichage
-                        datetime_str = weather_datetime_str
-
-                        # Créer l'échantillon
-                        sample = AdjustmentSample(
-                            facade_id=facade,
-                            datetime_str=datetime_str,
-                            weather_datetime_str=weather_datetime_str,
-                            solar_datetime_str=solar_datetime_str,
-                            original_temp=weather_point.temperature,
-                            adjusted_temp=weather_point.temperature + delta_t,
-                            solar_irradiance=irradiance,
-                            weather_datetime_utc=utc_dt,
-                            solar_datetime_utc=solar_point.to_datetime_utc(),
-                        )
-
-                        # Déterminer si c'est l'heure d'été ou d'hiver
-                        season_type = "summer" if solar_point.is_dst else "winter"
-
-                        # Ajouter à la collection des ajustements possibles
-                        all_adjustments_by_facade_season[facade][season_type].append(
-                            sample
-                        )
-
         # Créer la liste finale des échantillons pour l'affichage
         sample_adjustments = []
 
-        # Sélectionner des échantillons bien espacés pour chaque façade et type de saison
-        total_possible_adjustments = 0
+        # Sélectionner des échantillons bien espacés pour chaque façade et type de saison.
+        # La sélection se fait sur les indices des heures ajustées: seuls les échantillons
+        # retenus sont construits.
         for facade in facades:
-            for season_type in ["winter", "summer"]:
-                total_possible_adjustments += len(
-                    all_adjustments_by_facade_season[facade][season_type]
-                )
-
-                if all_adjustments_by_facade_season[facade][season_type]:
+            indices_by_season = {"winter": [], "summer": []}
+            for i in adjusted_indices_by_facade[facade]:
+                # Déterminer si c'est l'heure d'été ou d'hiver
+                season_type = "summer" if aligned.solar_points[i].is_dst else "winter"
+                indices_by_season[season_type].append(i)
+
+            for season_type, available_indices in indices_by_season.items():
+                if not available_indices:
                     logger.info(
-                        f"Sélection d'échantillons pour {facade} ({season_type}): {len(all_adjustments_by_facade_season[facade][season_type])} disponibles"
+                        f"Pas d'exemple de {season_type} disponible pour la façade {facade}"
                     )
+                    continue
 
-                    # Trier les ajustements par date/heure
-                    all_adjustments_by_facade_season[facade][season_type].sort(
-                        key=lambda x: (
-                            x.weather_datetime_utc.month,
-                            x.weather_datetime_utc.day,
-                            x.weather_datetime_utc.hour,
-                        )
-                    )
+                logger.info(
+                    f"Sélection d'échantillons pour {facade} ({season_type}): {len(available_indices)} disponibles"
+                )
+                selected_indices = self._select_spaced_indices(
+                    available_indices, weather_datetimes_utc, max_samples_per_type
+                )
 
-                    # Pour garantir des exemples bien espacés, on essaie de prendre des échantillons de différentes parties de l'année
-                    available_samples = all_adjustments_by_facade_season[facade][
-                        season_type
-                    ]
-                    selected_samples = []
-
-                    if len(available_samples) <= max_samples_per_type:
-                        # Si nous avons peu d'échantillons, prenons-les tous
-                        selected_samples = available_samples
-                    else:
-                        # Diviser l'ensemble des ajustements en segments et prendre un échantillon de chaque segment
-                        segment_size = len(available_samples) // max_samples_per_type
-
-                        for i in range(max_samples_per_type):
-                            idx = i * segment_size + (
-                                segment_size // 2
-                            )  # Prendre un échantillon au milieu de chaque segment
-                            if idx < len(available_samples):
-                                selected_samples.append(available_samples[idx])
-
-                    # Vérifier que les échantillons sont suffisamment espacés (différents jours si possible)
-                    final_samples = []
-                    used_days = set()
-
-                    for sample in selected_samples:
-                        day_key = (
-                            sample.weather_datetime_utc.month,
-                            sample.weather_datetime_utc.day,
-                        )
+                for i in selected_indices:
+                    weather_point = weather_data[i]
+                    solar_point = aligned.solar_points[i]
 
-                        # Si ce jour est déjà utilisé et qu'on a d'autres options, chercher un autre jour
-                        if day_key in used_days and len(final_samples) < len(
-                            available_samples
-                        ):
-                            # Chercher un échantillon d'un autre jour
-                            for alt_sample in available_samples:
-                                alt_day_key = (
-                                    alt_sample.weather_datetime_utc.month,
-                                    alt_sample.weather_datetime_utc.day,
-                                )
-                                if alt_day_key not in used_days:
-                                    sample = alt_sample
-                                    day_key = alt_day_key
-                                    break
-
-                        used_days.add(day_key)
-                        final_samples.append(sample)
-
-                    # Ajouter les échantillons sélectionnés à notre collection finale
-                    sample_adjustments.extend(final_samples)
-                    logger.debug(
-                        f"Ajouté {len(final_samples)} échantillons espacés pour {facade} ({season_type})"
-                    )
-                else:
-                    logger.info(
-                        f"Pas d'exemple de {season_type} disponible pour la façade {facade}"
+                    # Créer l'échantillon (format commun pour affichage: celui du fichier DAT)
+                    weather_datetime_str = (
+                        weather_point.get_original_datetime_str()
+                    )  # Format 1-24 MEZ
+                    sample_adjustments.append(
+                        AdjustmentSample(
+                            facade_id=facade,
+                            datetime_str=weather_datetime_str,
+                            weather_datetime_str=weather_datetime_str,
+                            solar_datetime_str=(
+                                solar_point.get_original_datetime_str()
+                            ),  # Format 0-23 MEZ/MESZ
+                            original_temp=weather_point.temperature,
+                            adjusted_temp=weather_point.temperature + delta_t,
+                            solar_irradiance=aligned.irradiance_by_facade[facade][i],
+                            weather_datetime_utc=weather_datetimes_utc[i],
+                            solar_datetime_utc=solar_point.to_datetime_utc(),
+                        )
                     )
 
+                logger.debug(
+                    f"Ajouté {len(selected_indices)} échantillons espacés pour {facade} ({season_type})"
+                )
+
         logger.info(
-            f"Collecté {len(sample_adjustments)} exemples représentatifs sur {total_possible_adjustments} ajustements possibles"
+            f"Collecté {len(sample_adjustments)} exemples représentatifs sur {total_adjustments} ajustements possibles"
         )
 
         return PreviewData(
@@ -208,14 +345,32 @@ class SoschuProcessor:
             adjustments_by_facade=adjustments_by_facade,
             sample_adjustments=sample_adjustments,
             weather_data=weather_data,
-            solar_data=solar_data,
-            weather_file_header=weather_header,
+            solar_data=inputs.solar_data,
+            weather_file_header=inputs.weather_header,
             threshold=threshold,
             delta_t=delta_t,
-            weather_file_path=weather_file,  # Ajouter le chemin du fichier météo
-            solar_file_path=solar_file,  # Ajouter le chemin du fichier solaire
+            weather_file_path=inputs.weather_file,  # Ajouter le chemin du fichier météo
+            solar_file_path=inputs.solar_file,  # Ajouter le chemin du fichier solaire
         )
 
+    def _log_adjustments(
+        self, facade: str, preview_data: PreviewData, aligned: AlignedSolarData
+    ) -> None:
+        """Journalise (niveau DEBUG) chaque heure ajustée pour une façade."""
+        for weather_point, solar_point, irradiance in zip(
+            preview_data.weather_data,
+            aligned.solar_points,
+            aligned.irradiance_by_facade[facade],
+        ):
+            if irradiance > preview_data.threshold:
+                logger.debug(
+                    f"Ajustement pour {facade}: {weather_point.get_original_datetime_str()} (DAT) -> "
+                    f"{solar_point.get_original_datetime_str()} (HTML), "
+                    f"Irradiance: {irradiance:.1f}, "
+                    f"Temp: {weather_point.temperature:.1f} -> "
+                    f"{weather_point.temperature + preview_data.delta_t:.1f}"
+                )
+
     def generate_files(self, preview_data: PreviewData, output_dir: str) -> list[str]:
         """Génère les fichiers de sortie basés sur les données de prévisualisation."""
 
@@ -224,13 +379,25 @@ class SoschuProcessor:
 
         generated_files = []
 
-        # Créer un index des données solaires (basé sur UTC)
-        solar_index = {}
-        for solar_point in preview_data.solar_data:
-            # Convertir en UTC pour la comparaison
-            utc_dt = solar_point.to_datetime_utc()
-            key = (utc_dt.year, utc_dt.month, utc_dt.day, utc_dt.hour, utc_dt.minute)
-            solar_index[key] = solar_point
+        # Aligner les données solaires sur les données météo (basé sur UTC)
+        aligned = self._align_solar_data(
+            preview_data.weather_data, preview_data.solar_data, preview_data.facades
+        )
+
+        # Les messages de débogage par ligne ne sont formatés que s'ils sont émis
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        # Les lignes de sortie ne dépendent pas de la façade: chaque heure est formatée
+        # une fois sans ajustement et une fois avec, puis partagée entre les façades
+        weather_data = preview_data.weather_data
+        unchanged_lines = [
+            _format_weather_line(point.raw_line, point.temperature) for point in weather_data
+        ]
+        shifted_lines = [
+            _format_weather_line(point.raw_line, point.temperature + preview_data.delta_t)
+            for point in weather_data
+        ]
+        threshold = preview_data.threshold
 
         # Générer un fichier par façade
         for facade in preview_data.facades:
@@ -241,48 +408,25 @@ class SoschuProcessor:
             filename = f"{weather_file_name}_{facade.replace(' ', '_')}.dat"
             output_file = output_path / filename
 
-            with output_file.open("w", encoding="iso-8859-1") as f:
-                # Écrire le header
-                f.write(preview_data.weather_file_header)
-
-                # Écrire les données ajustées
-                for weather_point in preview_data.weather_data:
-                    # Convertir en UTC pour la comparaison
-                    utc_dt = weather_point.to_datetime_utc()
-                    key = (
-                        utc_dt.year,
-                        utc_dt.month,
-                        utc_dt.day,
-                        utc_dt.hour,
-                        utc_dt.minute,
-                    )
-
-                    # Vérifier s'il faut ajuster la température pour cette façade
-                    adjusted_temp = weather_point.temperature
-                    if key in solar_index:
-                        solar_point = solar_index[key]
-                        irradiance = solar_point.irradiance_by_facade.get(facade, 0)
-
-                        if irradiance > preview_data.threshold:
-                            adjusted_temp = (
-                                weather_point.temperature + preview_data.delta_t
-                            )
-                            logger.debug(
-                                f"Ajustement pour {facade}: {weather_point.get_original_datetime_str()} (DAT) -> "
-                                f"{solar_point.get_original_datetime_str()} (HTML), "
-                                f"Irradiance: {irradiance:.1f}, "
-                                f"Temp: {weather_point.temperature:.1f} -> {adjusted_temp:.1f}"
-                            )
-
-                    adjusted_temperature_str = f"{adjusted_temp:.1f}".rjust(5)
-                    raw_line = weather_point.raw_line
-
-                    # Reconstruire la ligne en préservant tout le formatage original
-                    adjusted_line = (
-                        raw_line[:25] + adjusted_temperature_str + raw_line[25 + 5 :]
+            irradiance_column = aligned.irradiance_by_facade[facade]
+            if max(irradiance_column, default=NO_IRRADIANCE) <= threshold:
+                # Aucune heure au-dessus du seuil: pas de comparaison heure par heure
+                output_lines = unchanged_lines
+            else:
+                if debug_enabled:
+                    self._log_adjustments(facade, preview_data, aligned)
+
+                # Choisir la ligne ajustée ou non au fil de l'écriture
+                output_lines = (
+                    shifted if irradiance > threshold else unchanged
+                    for irradiance, shifted, unchanged in zip(
+                        irradiance_column, shifted_lines, unchanged_lines
                     )
+                )
 
-                    f.write(adjusted_line)
+            with output_file.open("w", encoding="iso-8859-1") as f:
+                f.write(preview_data.weather_file_header)
+                f.writelines(output_lines)
 
             generated_files.append(str(output_file))
             logger.info(f"Generated file: {output_file}")
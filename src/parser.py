@@ -2,15 +2,27 @@ from __future__ import annotations
 
 import logging
 import re
-from datetime import datetime, timedelta
 from pathlib import Path
 
-from constants import MEZ_TIMEZONE
-from solar import SolarPoint
+from solar import SolarPoint, is_summer_time
 from weather import WeatherPoint
 
 logger = logging.getLogger(__name__)
 
+# Ligne marquant la fin de l'en-tête d'un fichier météo TRY (.dat)
+WEATHER_DATA_MARKER = "***"
+# Préfixe des lignes de commentaire dans les données météo
+_WEATHER_COMMENT_PREFIX = "*"
+
+# En-tête de colonne d'une façade, p. ex. "Gesamte solare Einstrahlung, f2$Building body, W/m2"
+_SOLAR_FACADE_PATTERN = re.compile(
+    r"Gesamte solare Einstrahlung,\s*(f[\da-zA-Z]+(?:\$[^\s,]+(?: [^\s,]+)?)?),\s*W/m2"
+)
+# Cellule contenant la date/heure d'une ligne du tableau solaire (format 0-23)
+_SOLAR_DATETIME_PATTERN = re.compile(r"<td class=value>(\d{2})\.(\d{2})\.(\d{4}) (\d{2}):(\d{2})")
+# Cellule contenant une valeur d'irradiance
+_SOLAR_VALUE_PATTERN = re.compile(r"<td class=value>([0-9.]+)")
+
 
 class WeatherParser:
     """Parser simplifié pour les fichiers météo .dat."""
@@ -26,42 +38,41 @@ class WeatherParser:
         Returns:
             Tuple[header, weather_points]
         """
-        with Path(file_path).open(encoding="iso-8859-1") as f:
-            lines = f.readlines()
-
-        # Trouver où commence les données (après "*** ")
-        data_start = 0
-        header_lines = []
-
-        for i, line in enumerate(lines):
-            if line.strip().startswith("***"):
-                header_lines.append(line)
-                data_start = i + 1
-                break
-            header_lines.append(line)
-
-        header = "".join(header_lines)
         weather_points = []
 
-        # Parser les lignes de données (ignorer les lignes vides et les commentaires)
-        for raw_line in lines[data_start:]:
-            stripped = raw_line.strip()
-            if stripped and not stripped.startswith("*"):
-                try:
-                    parts = stripped.split()
-                    if len(parts) >= 17:
-                        weather_points.append(
-                            WeatherPoint(
-                                month=int(parts[2]),
-                                day=int(parts[3]),
-                                hour=int(parts[4]),
-                                temperature=float(parts[5]),
-                                raw_line=stripped + "\n",
-                                year=year,
+        with Path(file_path).open(encoding="iso-8859-1") as f:
+            # Lire l'en-tête jusqu'à la ligne "*** " incluse, le reste est lu au fil de l'eau
+            header_lines = []
+            for line in f:
+                header_lines.append(line)
+                if line.lstrip().startswith(WEATHER_DATA_MARKER):
+                    data_lines = f
+                    break
+            else:
+                # Pas de marqueur de début des données: tout le fichier est parsé
+                data_lines = header_lines
+
+            header = "".join(header_lines)
+
+            # Parser les lignes de données (ignorer les lignes vides et les commentaires)
+            for raw_line in data_lines:
+                stripped = raw_line.strip()
+                if stripped and not stripped.startswith(_WEATHER_COMMENT_PREFIX):
+                    try:
+                        parts = stripped.split()
+                        if len(parts) >= 17:
+                            weather_points.append(
+                                WeatherPoint(
+                                    month=int(parts[2]),
+                                    day=int(parts[3]),
+                                    hour=int(parts[4]),
+                                    temperature=float(parts[5]),
+                                    raw_line=stripped + "\n",
+                                    year=year,
+                                )
                             )
-                        )
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"Impossible de parser la ligne: {stripped}: {e}")
+                    except (ValueError, IndexError) as e:
+                        logger.warning(f"Impossible de parser la ligne: {stripped}: {e}")
 
         logger.info(f"Parsed {len(weather_points)} weather points from {file_path}")
         return header, weather_points
@@ -76,8 +87,7 @@ class SolarParser:
             content = f.read()
 
         # Rechercher les façades dans les headers du tableau
-        facade_pattern = r"Gesamte solare Einstrahlung,\s*(f[\da-zA-Z]+(?:\$[^\s,]+(?: [^\s,]+)?)?),\s*W/m2"
-        facades = re.findall(facade_pattern, content)
+        facades = _SOLAR_FACADE_PATTERN.findall(content)
 
         # Nettoyer les noms de façades (remplacer $ par espace)
         facades = [facade.replace("$", " ") for facade in facades]
@@ -86,49 +96,41 @@ class SolarParser:
 
         solar_points = []
 
-        # Rechercher les lignes de données avec regex
-        # Pattern pour les lignes complètes avec date et valeurs
-        data_pattern = r"<td class=value>(\d{2})\.(\d{2})\.(\d{4}) (\d{2}):(\d{2})"
-
         # Diviser le contenu en lignes pour faciliter le parsing
         lines = content.split("\n")
 
+        # Les messages de débogage par point ne sont formatés que s'ils sont émis
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
         i = 0
         while i < len(lines):
             line = lines[i]
 
             # Chercher une ligne avec date/heure
-            date_match = re.search(data_pattern, line)
+            date_match = _SOLAR_DATETIME_PATTERN.search(line)
             if date_match:
-                day = int(date_match.group(1))
-                month = int(date_match.group(2))
-                year = int(date_match.group(3))
-                hour = int(date_match.group(4))  # Format 0-23 dans le HTML
-                minute = int(date_match.group(5))
+                # Heure au format 0-23 dans le HTML
+                day, month, year, hour, minute = map(int, date_match.groups())
 
                 # Déterminer si c'est l'heure d'été (MESZ) ou l'heure d'hiver (MEZ)
-                dt_naive = datetime(year, month, day, hour, minute)
-                dt_aware = MEZ_TIMEZONE.localize(dt_naive)
-                is_dst = dt_aware.dst() != timedelta(0)
+                is_dst = is_summer_time(year, month, day, hour)
 
                 # Chercher les valeurs dans les lignes suivantes
                 irradiance_values = {}
 
-                # Rechercher les valeurs numériques dans les lignes suivantes
-                # for j in range(1, min(len(facades) + 1, 5)):  # Limite à 5 lignes suivantes
-                for j in range(1, len(facades) + 1):
-                    if i + j < len(lines):
-                        value_line = lines[i + j]
-                        value_match = re.search(
-                            r"<td class=value>([0-9.]+)", value_line
-                        )
-                        if value_match and j - 1 < len(facades):
-                            try:
-                                value = float(value_match.group(1))
-                                facade_name = facades[j - 1]
-                                irradiance_values[facade_name] = value
-                            except (ValueError, IndexError):
-                                pass
+                # Les lignes suivantes contiennent une valeur par façade, dans l'ordre
+                # des en-têtes: associer directement chaque façade à sa ligne
+                value_lines = lines[i + 1 : i + 1 + len(facades)]
+                for facade_name, value_line in zip(facades, value_lines):
+                    value_match = _SOLAR_VALUE_PATTERN.search(value_line)
+                    if not value_match:
+                        continue
+                    try:
+                        value = float(value_match.group(1))
+                    except ValueError:
+                        # Valeur illisible: façade ignorée pour cette heure
+                        continue
+                    irradiance_values[facade_name] = value
 
                 # Si on a trouvé des valeurs, créer le point solaire
                 if irradiance_values:
@@ -144,17 +146,16 @@ class SolarParser:
                     )
 
                     # Log pour le debugging
-                    dst_info = "MESZ" if is_dst else "MEZ"
-                    logger.debug(
-                        f"Parsed solar point: {year}, {month:02d}/{day:02d} {hour:02d}:{minute:02d} ({dst_info})"
-                    )
+                    if debug_enabled:
+                        dst_info = "MESZ" if is_dst else "MEZ"
+                        logger.debug(
+                            f"Parsed solar point: {year}, {month:02d}/{day:02d} {hour:02d}:{minute:02d} ({dst_info})"
+                        )
 
                 # Avancer dans le fichier
                 i += len(facades) + 1
             else:
                 i += 1
 
-        logger.info(
-            f"Parsed {len(solar_points)} solar points with {len(facades)} facades"
-        )
+        logger.info(f"Parsed {len(solar_points)} solar points with {len(facades)} facades")
         return solar_points
@@ -1,12 +1,39 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 
-from constants import MEZ_TIMEZONE
+from constants import DATACLASS_SLOTS
 
+# Premier instant représentable (jour ordinal 1): il correspond à `utc_hour == 24`
+_UTC_HOUR_ORIGIN = datetime(1, 1, 1, tzinfo=timezone.utc)
 
-@dataclass
+
+@lru_cache(maxsize=8)
+def _summer_time_bounds(
+    year: int,
+) -> tuple[tuple[int, int, int], tuple[int, int, int]]:
+    """
+    Renvoie le début et la fin de l'heure d'été (MESZ) en heure locale, sous la
+    forme (mois, jour, heure): du dernier dimanche de mars à 03:00 au dernier
+    dimanche d'octobre à 02:00.
+    """
+    march_last_sunday = 31 - (date(year, 3, 31).weekday() + 1) % 7
+    october_last_sunday = 31 - (date(year, 10, 31).weekday() + 1) % 7
+    return (3, march_last_sunday, 3), (10, october_last_sunday, 2)
+
+
+def is_summer_time(year: int, month: int, day: int, hour: int) -> bool:
+    """
+    Indique si une heure locale (0-23) d'Europe/Berlin est en heure d'été (MESZ).
+    L'heure ambiguë du passage à l'heure d'hiver est considérée comme MEZ.
+    """
+    start, end = _summer_time_bounds(year)
+    return start <= (month, day, hour) < end
+
+
+@dataclass(**DATACLASS_SLOTS)
 class SolarPoint:
     """Point de données solaire simplifié."""
 
@@ -16,23 +43,24 @@ class SolarPoint:
     irradiance_by_facade: dict[str, float]
     is_dst: bool = False  # Flag pour indiquer si c'est l'heure d'été
     year: int = 2045  # Année extraite du fichier HTML
+    # Numéro d'heure UTC absolu (jours ordinaux * 24 + heure), calculé à la création
+    utc_hour: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        offset_hours = 2 if self.is_dst else 1
+        self.utc_hour = (
+            date(self.year, self.month, self.day).toordinal() * 24 + self.hour - offset_hours
+        )
 
     def to_datetime_utc(self) -> datetime:
         """
         Convertit l'heure HTML (0-23 MEZ/MESZ) vers UTC pour la comparaison.
-        Les fichiers HTML tiennent compte du passage à l'heure d'été (MESZ).
+        Les fichiers HTML tiennent compte du passage à l'heure d'été (MESZ):
+        le décalage appliqué est celui indiqué par `is_dst`.
         Utilise l'année extraite du fichier HTML.
         """
-        # Créer un datetime naïf
-        dt_naive = datetime(self.year, self.month, self.day, self.hour, 0, 0)
-
-        # Appliquer la timezone MEZ/MESZ (Europe/Berlin)
-        dt_local = MEZ_TIMEZONE.localize(dt_naive, is_dst=self.is_dst)
-
-        # Convertir en UTC
-        dt_utc = dt_local.astimezone(timezone.utc)
-
-        return dt_utc
+        # Dérivé de `utc_hour`, calculé une seule fois à la création du point
+        return _UTC_HOUR_ORIGIN + timedelta(hours=self.utc_hour - 24)
 
     def get_original_datetime_str(self) -> str:
         """Renvoie la date/heure au format original du fichier HTML (0-23 MEZ/MESZ)"""
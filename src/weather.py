@@ -1,8 +1,10 @@
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
+from constants import DATACLASS_SLOTS, MEZ_OFFSET
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class WeatherPoint:
     """Point de données météo simplifié."""
 
@@ -18,19 +20,12 @@ class WeatherPoint:
         Convertit l'heure MEZ 1-24 vers UTC pour la comparaison.
         Les fichiers .dat utilisent l'heure MEZ fixe (sans passage à l'heure d'été).
         """
-        # Convertir l'heure 1-24 en format 0-23
-        hour_0_23 = self.hour - 1
-
-        # Créer un datetime naïf en MEZ
-        dt_naive = datetime(self.year, self.month, self.day, hour_0_23, 0, 0)
-
-        # Créer un datetime avec timezone MEZ (UTC+1) fixe sans tenir compte de l'heure d'été
-        dt_mez = dt_naive.replace(tzinfo=timezone(timedelta(hours=1)))
+        # Convertir l'heure 1-24 en format 0-23, en MEZ (UTC+1) fixe sans tenir
+        # compte de l'heure d'été
+        dt_mez = datetime(self.year, self.month, self.day, self.hour - 1, tzinfo=MEZ_OFFSET)
 
         # Convertir en UTC
-        dt_utc = dt_mez.astimezone(timezone.utc)
-
-        return dt_utc
+        return dt_mez.astimezone(timezone.utc)
 
     def get_original_datetime_str(self) -> str:
         """Renvoie la date/heure au format original du fichier DAT (1-24 MEZ)"""
@@ -2,27 +2,98 @@
 Pytest configuration et fixtures pour les tests du Soschu Temperature Tool.
 """
 
-import tempfile
 from datetime import datetime, timezone
+from parser import SolarParser, WeatherParser
 from pathlib import Path
 
 import pytest
 
+from core import SoschuProcessor
 from preview import AdjustmentSample, PreviewData
 from solar import SolarPoint
 from weather import WeatherPoint
 
+# Sample input files, resolved once at import
+_TEST_DATA_DIR = Path(__file__).parent / "data"
+_SAMPLE_WEATHER_FILE = str(_TEST_DATA_DIR / "TRY2045_488284093163_Jahr.dat")
+_SAMPLE_SOLAR_FILE = str(_TEST_DATA_DIR / "Solare Einstrahlung auf die Fassade.html")
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def sample_weather_file():
     """Path to the sample weather data file."""
-    return str(Path(__file__).parent / "data" / "TRY2045_488284093163_Jahr.dat")
+    return _SAMPLE_WEATHER_FILE
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_solar_file():
     """Path to the sample solar data file."""
-    return str(Path(__file__).parent / "data" / "Solare Einstrahlung auf die Fassade.html")
+    return _SAMPLE_SOLAR_FILE
+
+
+@pytest.fixture(scope="session")
+def require_sample_files(sample_weather_file, sample_solar_file):
+    """Skip the requesting tests, with a single check, without the sample files."""
+    if not Path(sample_weather_file).exists() or not Path(sample_solar_file).exists():
+        pytest.skip("Fichiers d'exemple non disponibles")
+
+
+@pytest.fixture(scope="session")
+def sample_weather_parsed(sample_weather_file):
+    """
+    (header, weather points) parsed from the sample weather file, once per session.
+
+    Tests must not mutate the points.
+    """
+    return WeatherParser().parse(sample_weather_file)
+
+
+@pytest.fixture(scope="session")
+def sample_solar_points(sample_solar_file):
+    """Solar points parsed from the sample solar file, once per session."""
+    return SolarParser().parse(sample_solar_file)
+
+
+@pytest.fixture(scope="session")
+def sample_inputs(sample_weather_file, sample_solar_file):
+    """
+    Sample files parsed by the processor (solar year applied), once per session.
+
+    Tests must not mutate the parsed data.
+    """
+    return SoschuProcessor().load_inputs(sample_weather_file, sample_solar_file)
+
+
+@pytest.fixture(scope="session")
+def sample_preview(sample_inputs):
+    """
+    Preview of the sample files for a given (threshold, delta_t).
+
+    Each combination is computed once per session from the shared parsed inputs;
+    tests must not mutate the result.
+    """
+    processor = SoschuProcessor()
+    previews: dict[tuple[float, float], PreviewData] = {}
+
+    def _preview(threshold: float = 200.0, delta_t: float = 7.0) -> PreviewData:
+        key = (threshold, delta_t)
+        if key not in previews:
+            [previews[key]] = processor.preview_adjustments_from_parsed(
+                sample_inputs, [threshold], [delta_t]
+            )
+        return previews[key]
+
+    return _preview
+
+
+@pytest.fixture(scope="session")
+def sample_generated_files(sample_preview, tmp_path_factory):
+    """
+    Output files generated once per session from the default sample preview
+    (threshold=200, delta_t=7). Tests must not modify them.
+    """
+    output_dir = tmp_path_factory.mktemp("outputs")
+    return SoschuProcessor().generate_files(sample_preview(), str(output_dir))
 
 
 @pytest.fixture
@@ -67,64 +138,57 @@ def sample_adjustment():
     )
 
 
-@pytest.fixture
-def sample_weather_data():
-    """Create a list of sample weather data points."""
-    data_points = []
+def _daily_temperature(hour: int) -> float:
+    """Simulated temperature variation throughout the day."""
+    return 15 + 10 * abs(12 - hour) / 12
+
+
+def _daylight_irradiance(peak: float, hour: int) -> float:
+    """Simulated irradiance: triangle peaking at noon, zero outside 06:00-18:00."""
+    if not 6 <= hour <= 18:
+        return 0
+    return max(0, peak * (1 - abs(12 - hour) / 6))
 
-    # Create data for one day (24 hours)
-    for hour in range(1, 25):
-        # Simulate temperature variation throughout the day
-        temp = 15 + 10 * abs(12 - hour) / 12
 
-        data_point = WeatherPoint(
+@pytest.fixture
+def sample_weather_data():
+    """Create a list of sample weather data points (one day, hours 1-24)."""
+    return [
+        WeatherPoint(
             month=6,
             day=15,
             hour=hour,  # Format 1-24
-            temperature=temp,
-            raw_line=f"06  15  {hour:02d}  {temp:.1f}  ...",
+            temperature=_daily_temperature(hour),
+            raw_line=f"06  15  {hour:02d}  {_daily_temperature(hour):.1f}  ...",
             year=2045,
         )
-        data_points.append(data_point)
+        for hour in range(1, 25)
+    ]
 
-    return data_points
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_solar_data():
-    """Create a list of sample solar data points."""
-    data_points = []
-
-    # Create data for one day (24 hours)
-    for hour in range(24):  # Format 0-23
-        # Simulate solar irradiance (only during daylight hours)
-        if 6 <= hour <= 18:
-            f2_irradiance = max(0, 750 * (1 - abs(12 - hour) / 6))
-            f3_irradiance = max(0, 250 * (1 - abs(12 - hour) / 6))
-            f4_irradiance = max(0, 100 * (1 - abs(12 - hour) / 6))
-        else:
-            f2_irradiance = 0
-            f3_irradiance = 0
-            f4_irradiance = 0
-
-        # Déterminer si heure d'été (MESZ)
-        is_dst = True  # Pour simplifier, on considère que juin est toujours en heure d'été
-
-        data_point = SolarPoint(
+    """
+    Create a list of sample solar data points (one day, hours 0-23).
+
+    Built once per session; tests must not mutate the points.
+    """
+    # Pour simplifier, on considère que juin est toujours en heure d'été (MESZ)
+    return [
+        SolarPoint(
             month=6,
             day=15,
             hour=hour,  # Format 0-23
             irradiance_by_facade={
-                "f2": f2_irradiance,
-                "f3": f3_irradiance,
-                "f4": f4_irradiance,
+                "f2": _daylight_irradiance(750, hour),
+                "f3": _daylight_irradiance(250, hour),
+                "f4": _daylight_irradiance(100, hour),
             },
-            is_dst=is_dst,
+            is_dst=True,
             year=2045,
         )
-        data_points.append(data_point)
-
-    return data_points
+        for hour in range(24)
+    ]
 
 
 @pytest.fixture
@@ -144,10 +208,3 @@ def sample_preview_data(sample_weather_data, sample_solar_data, sample_adjustmen
         weather_file_path="/path/to/weather.dat",
         solar_file_path="/path/to/solar.html",
     )
-
-
-@pytest.fixture
-def temp_output_dir():
-    """Provide a temporary directory for test outputs."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
@@ -4,27 +4,57 @@ Tests unitaires pour le module core_logic.py
 Ce module teste la classe SoschuProcessor et son traitement de données.
 """
 
+from datetime import datetime, timezone
+from parser import SolarParser
+from pathlib import Path
 from unittest.mock import patch
 
-from core import SoschuProcessor
+import pytest
+
+from core import NO_IRRADIANCE, SoschuProcessor
 from preview import PreviewData
 from solar import SolarPoint
 from weather import WeatherPoint
 
+# Points solaires de référence pour les tests de recherche par date/heure UTC
+_LOOKUP_SOLAR_DATA = (
+    SolarPoint(
+        month=1,
+        day=1,
+        hour=11,
+        irradiance_by_facade={"f2": 150.5},
+        is_dst=False,
+        year=2023,
+    ),
+    SolarPoint(
+        month=6,
+        day=15,
+        hour=13,
+        irradiance_by_facade={"f2": 350.2},
+        is_dst=True,
+        year=2023,
+    ),
+)
+
+
+@pytest.fixture(scope="module")
+def processor():
+    """Processeur partagé: il ne conserve aucun état entre deux appels."""
+    return SoschuProcessor()
+
 
 class TestSoschuProcessor:
     """Tests pour la classe SoschuProcessor."""
 
-    def test_processor_creation(self):
+    def test_processor_creation(self, processor):
         """Test la création du processeur."""
-        processor = SoschuProcessor()
         assert processor is not None
         assert processor.weather_parser is not None
         assert processor.solar_parser is not None
 
     @patch("parser.WeatherParser.parse")
     @patch("parser.SolarParser.parse")
-    def test_preview_adjustments_basic(self, mock_solar_parse, mock_weather_parse):
+    def test_preview_adjustments_basic(self, mock_solar_parse, mock_weather_parse, processor):
         """Test la méthode de prévisualisation des ajustements avec valeurs simulées."""
         # Configurer les mocks pour simuler les parsers
         mock_weather_header = "Mock header"
@@ -90,7 +120,6 @@ class TestSoschuProcessor:
         mock_solar_parse.return_value = mock_solar_data
 
         # Exécuter la méthode de prévisualisation
-        processor = SoschuProcessor()
         preview_data = processor.preview_adjustments(
             weather_file="mock_weather.dat",
             solar_file="mock_solar.html",
@@ -112,14 +141,13 @@ class TestSoschuProcessor:
 
     @patch("parser.WeatherParser.parse")
     @patch("parser.SolarParser.parse")
-    def test_empty_data_handling(self, mock_solar_parse, mock_weather_parse):
+    def test_empty_data_handling(self, mock_solar_parse, mock_weather_parse, processor):
         """Test la gestion des données vides."""
         # Configurer les mocks pour renvoyer des données vides
         mock_weather_parse.return_value = ("Header", [])
         mock_solar_parse.return_value = []
 
         # Exécuter la méthode
-        processor = SoschuProcessor()
         preview_data = processor.preview_adjustments(
             weather_file="empty_weather.dat",
             solar_file="empty_solar.html",
@@ -136,7 +164,7 @@ class TestSoschuProcessor:
 
     @patch("parser.WeatherParser.parse")
     @patch("parser.SolarParser.parse")
-    def test_threshold_effect(self, mock_solar_parse, mock_weather_parse):
+    def test_threshold_effect(self, mock_solar_parse, mock_weather_parse, processor):
         """Test l'effet du seuil sur les ajustements."""
         # Données météo simulées constantes
         mock_weather_data = [
@@ -150,12 +178,12 @@ class TestSoschuProcessor:
             ),
         ]
 
-        # Données solaires simulées
+        # Données solaires simulées (12:00 MESZ = 11:00 MEZ = heure 12 du fichier DAT)
         mock_solar_data = [
             SolarPoint(
                 month=6,
                 day=15,
-                hour=11,
+                hour=12,
                 irradiance_by_facade={"f2": 150.0, "f3": 250.0, "f4": 350.0},
                 is_dst=True,
                 year=2045,
@@ -167,8 +195,6 @@ class TestSoschuProcessor:
         mock_solar_parse.return_value = mock_solar_data
 
         # Test avec différents seuils
-        processor = SoschuProcessor()
-
         # Seuil bas (toutes les façades devraient être ajustées)
         preview_low = processor.preview_adjustments(
             weather_file="mock_weather.dat",
@@ -209,3 +235,166 @@ class TestSoschuProcessor:
         assert preview_high.adjustments_by_facade["f2"] == 0
         assert preview_high.adjustments_by_facade["f3"] == 0
         assert preview_high.adjustments_by_facade["f4"] > 0
+
+    @patch("parser.WeatherParser.parse")
+    @patch("parser.SolarParser.parse")
+    def test_preview_adjustments_batch(self, mock_solar_parse, mock_weather_parse, processor):
+        """Test la prévisualisation de plusieurs combinaisons en un seul parsing."""
+        mock_weather_parse.return_value = (
+            "Header",
+            [
+                WeatherPoint(
+                    month=6,
+                    day=15,
+                    hour=12,
+                    temperature=25.0,
+                    raw_line="06 15 12 25.0",
+                    year=2045,
+                )
+            ],
+        )
+        mock_solar_parse.return_value = [
+            SolarPoint(
+                month=6,
+                day=15,
+                hour=12,
+                irradiance_by_facade={"f2": 150.0, "f3": 250.0},
+                is_dst=True,
+                year=2045,
+            )
+        ]
+
+        previews = processor.preview_adjustments_batch(
+            weather_file="mock_weather.dat",
+            solar_file="mock_solar.html",
+            thresholds=[100.0, 200.0],
+            delta_ts=[5.0, 10.0],
+        )
+
+        assert mock_weather_parse.call_count == 1
+        assert mock_solar_parse.call_count == 1
+
+        # Une prévisualisation par combinaison, seuils puis delta T
+        assert [(p.threshold, p.delta_t) for p in previews] == [
+            (100.0, 5.0),
+            (100.0, 10.0),
+            (200.0, 5.0),
+            (200.0, 10.0),
+        ]
+        assert [p.total_adjustments for p in previews] == [2, 2, 1, 1]
+        assert [p.sample_adjustments[0].adjusted_temp for p in previews] == [
+            30.0,
+            35.0,
+            30.0,
+            35.0,
+        ]
+
+    @pytest.mark.parametrize(
+        ("weather_kwargs", "expected_irradiance"),
+        [
+            # 12:00 (1-24 MEZ) = 10:00 UTC = 11:00 MEZ côté solaire
+            ({"month": 1, "day": 1, "hour": 12, "temperature": 5.0}, 150.5),
+            # 13:00 (1-24 MEZ) = 11:00 UTC = 13:00 MESZ côté solaire
+            ({"month": 6, "day": 15, "hour": 13, "temperature": 25.0}, 350.2),
+            # Aucune donnée solaire pour cette heure
+            ({"month": 12, "day": 31, "hour": 24, "temperature": 0.0}, None),
+        ],
+    )
+    def test_get_solar_point_for_datetime(self, processor, weather_kwargs, expected_irradiance):
+        """Test la recherche du point solaire correspondant à un point météo."""
+        solar_index = processor._create_solar_index(_LOOKUP_SOLAR_DATA)
+        weather_point = WeatherPoint(raw_line="", year=2023, **weather_kwargs)
+
+        solar_point = processor._get_solar_point_for_datetime(
+            solar_index, weather_point.to_datetime_utc()
+        )
+
+        if expected_irradiance is None:
+            assert solar_point is None
+        else:
+            assert solar_point.irradiance_by_facade["f2"] == expected_irradiance
+
+    def test_align_solar_data(self, processor):
+        """Test l'alignement des données solaires sur les points météo."""
+        weather_data = [
+            WeatherPoint(month=1, day=1, hour=12, temperature=5.0, raw_line="", year=2023),
+            WeatherPoint(month=1, day=1, hour=13, temperature=6.0, raw_line="", year=2023),
+            WeatherPoint(month=6, day=15, hour=13, temperature=25.0, raw_line="", year=2023),
+        ]
+
+        aligned = processor._align_solar_data(weather_data, list(_LOOKUP_SOLAR_DATA), ["f2", "f3"])
+
+        assert aligned.solar_points == [
+            _LOOKUP_SOLAR_DATA[0],
+            None,
+            _LOOKUP_SOLAR_DATA[1],
+        ]
+        assert aligned.weather_datetimes_utc == [point.to_datetime_utc() for point in weather_data]
+        # Heure sans donnée solaire: jamais ajustée; façade absente: irradiance nulle
+        assert aligned.irradiance_by_facade == {
+            "f2": [150.5, NO_IRRADIANCE, 350.2],
+            "f3": [0.0, NO_IRRADIANCE, 0.0],
+        }
+
+    @pytest.mark.integration
+    @pytest.mark.usefixtures("require_sample_files")
+    def test_solar_file_parsed_once_across_thresholds(
+        self, processor, sample_weather_file, sample_solar_file
+    ):
+        """Test que le fichier solaire n'est parsé qu'une fois pour plusieurs seuils."""
+        with patch.object(
+            SolarParser, "parse", autospec=True, side_effect=SolarParser.parse
+        ) as mock_solar_parse:
+            preview_low, preview_high = processor.preview_adjustments_batch(
+                sample_weather_file, sample_solar_file, [100.0, 300.0], [7.0]
+            )
+
+        assert mock_solar_parse.call_count == 1
+        assert preview_low.solar_data is preview_high.solar_data
+        assert preview_low.total_adjustments > preview_high.total_adjustments
+
+    @pytest.mark.integration
+    @pytest.mark.usefixtures("require_sample_files")
+    def test_preview_adjustments_from_parsed(
+        self, processor, sample_weather_file, sample_solar_file, sample_inputs
+    ):
+        """Test qu'une prévisualisation sur fichiers déjà parsés est identique."""
+        [from_parsed] = processor.preview_adjustments_from_parsed(sample_inputs, [200.0], [7.0])
+
+        assert from_parsed == processor.preview_adjustments(
+            sample_weather_file, sample_solar_file, threshold=200.0, delta_t=7.0
+        )
+
+    def test_select_spaced_indices(self, processor):
+        """Test la sélection d'échantillons espacés sur des jours différents."""
+        # Six heures le 1er juin puis une heure le 2 juin
+        weather_datetimes_utc = [
+            datetime(2023, 6, 1, hour, tzinfo=timezone.utc) for hour in range(6, 12)
+        ] + [datetime(2023, 6, 2, 12, tzinfo=timezone.utc)]
+
+        selected = processor._select_spaced_indices(
+            list(range(len(weather_datetimes_utc))), weather_datetimes_utc, 3
+        )
+
+        # Un échantillon par segment, le doublon du 1er juin est remplacé par le 2 juin;
+        # faute d'autre jour disponible, le troisième reste le 1er juin
+        assert selected == [1, 6, 5]
+
+        # Peu d'ajustements: tous sont retenus, dans l'ordre chronologique
+        few = processor._select_spaced_indices([4, 2], weather_datetimes_utc, 3)
+        assert few == [2, 4]
+
+    @pytest.mark.integration
+    @pytest.mark.usefixtures("require_sample_files")
+    def test_generate_files_above_max_irradiance(self, processor, sample_preview, tmp_path):
+        """Test qu'un seuil jamais atteint produit des fichiers identiques à l'original."""
+        preview_data = sample_preview(threshold=10_000.0)
+
+        generated_files = processor.generate_files(preview_data, str(tmp_path))
+
+        expected = preview_data.weather_file_header + "".join(
+            point.raw_line for point in preview_data.weather_data
+        )
+        assert len(generated_files) == len(preview_data.facades)
+        for generated_file in generated_files:
+            assert Path(generated_file).read_text(encoding="iso-8859-1") == expected
@@ -5,105 +5,146 @@ Ce module teste le comportement complet de l'application en intégrant
 les différents composants et modules ensemble.
 """
 
-import tempfile
 import time
-from parser import SolarParser, WeatherParser
+import tracemalloc
+from parser import WEATHER_DATA_MARKER
 from pathlib import Path
 
 import pytest
 
 from core import SoschuProcessor
 from preview import PreviewData
+from weather import WeatherPoint
 
+# Tout le module parse et traite les fichiers d'exemple complets:
+# `pytest -m "not integration"` l'écarte de la boucle de développement rapide
+pytestmark = [pytest.mark.integration, pytest.mark.usefixtures("require_sample_files")]
 
-@pytest.fixture
-def sample_weather_file():
-    """Fixture pour un fichier météo de test."""
-    return str(Path(__file__).parent / "data" / "TRY2045_488284093163_Jahr.dat")
 
+# Taille des blocs lus dans les fichiers .dat: l'en-tête TRY (~3 Ko) tient dans le premier
+_DAT_BLOCK_SIZE = 8192
 
-@pytest.fixture
-def sample_solar_file():
-    """Fixture pour un fichier solaire de test."""
-    return str(
-        Path(__file__).parent / "data" / "Solare Einstrahlung auf die Fassade.html"
-    )
+# Pic mémoire admis pour prévisualiser et générer une année horaire (8760 points):
+# ~10 Mo mesurés avec tracemalloc, marge suffisante pour les variations de plateforme
+_PEAK_MEMORY_BUDGET = 64 * 1024 * 1024
+# Budget de temps du traitement complet, en nanosecondes (30 s)
+_PROCESSING_TIME_BUDGET_NS = 30_000_000_000
 
 
-class TestEndToEndWorkflow:
-    """Tests pour le workflow complet de l'application."""
+def _read_dat_structure(file_path: str) -> tuple[str, int]:
+    """Renvoie l'en-tête (marqueur inclus) et le nombre de lignes de données d'un .dat."""
+    with Path(file_path).open("rb") as f:
+        block = f.read(_DAT_BLOCK_SIZE)
+        marker_start = block.index(WEATHER_DATA_MARKER.encode("iso-8859-1"))
+        header_end = block.index(b"\n", marker_start) + 1
 
-    def test_complete_processing_pipeline(self, sample_weather_file, sample_solar_file):
-        """Test le pipeline complet de traitement des données."""
-        # Vérifier que les fichiers existent
-        if not Path(sample_weather_file).exists():
-            pytest.skip("Fichier météo d'exemple non disponible")
-        if not Path(sample_solar_file).exists():
-            pytest.skip("Fichier solaire d'exemple non disponible")
+        # Compter les fins de ligne bloc par bloc, sans décoder les données
+        data_line_count = block.count(b"\n", header_end)
+        for chunk in iter(lambda: f.read(_DAT_BLOCK_SIZE), b""):
+            data_line_count += chunk.count(b"\n")
 
-        # Initialiser le processeur
-        processor = SoschuProcessor()
+    header = block[:header_end].decode("iso-8859-1").replace("\r\n", "\n")
+    return header, data_line_count
 
-        # Créer un répertoire temporaire pour les fichiers de sortie
-        with tempfile.TemporaryDirectory():
-            # Exécuter la prévisualisation
-            preview_data = processor.preview_adjustments(
-                weather_file=sample_weather_file,
-                solar_file=sample_solar_file,
-                threshold=200.0,
-                delta_t=7.0,
-            )
 
-            # Vérifier la structure des données de prévisualisation
-            assert isinstance(preview_data, PreviewData)
-            assert len(preview_data.facades) > 0
-            assert preview_data.total_data_points > 0
+def _count_adjusted_lines(file_path: str, weather_data: list[WeatherPoint]) -> int:
+    """Compte, en une seule passe, les heures dont la température a été augmentée."""
+    with Path(file_path).open(encoding="iso-8859-1") as f:
+        for line in f:
+            if line.lstrip().startswith(WEATHER_DATA_MARKER):
+                break
+        return sum(
+            1 for line, point in zip(f, weather_data) if float(line[25:30]) > point.temperature
+        )
 
-            # Vérifier que certaines façades ont des ajustements
-            assert preview_data.total_adjustments > 0
-            assert any(
-                count > 0 for count in preview_data.adjustments_by_facade.values()
-            )
 
-            # Vérifier les échantillons d'ajustement
-            assert len(preview_data.sample_adjustments) > 0
-            for sample in preview_data.sample_adjustments:
-                # La température ajustée devrait être plus élevée que l'originale
-                assert sample.adjusted_temp > sample.original_temp
-                # La différence devrait être égale à delta_t (7.0)
-                assert sample.adjusted_temp - sample.original_temp == pytest.approx(7.0)
+def _assert_dat_outputs(generated_files: list[str], preview_data: PreviewData) -> None:
+    """Un fichier par façade, en-tête d'origine conservé et une ligne par heure."""
+    assert len(generated_files) == len(preview_data.facades)
+    for generated_file in generated_files:
+        header, data_line_count = _read_dat_structure(generated_file)
+        assert header == preview_data.weather_file_header
+        assert data_line_count == preview_data.total_data_points
 
-            # TODO: Ajouter test de génération de fichiers de sortie
-            # Une fois que la méthode d'export est implémentée dans SoschuProcessor
 
-    def test_data_synchronization(self, sample_weather_file, sample_solar_file):
-        """Test la synchronisation entre les données météo et solaires."""
-        # Vérifier que les fichiers existent
-        if (
-            not Path(sample_weather_file).exists()
-            or not Path(sample_solar_file).exists()
-        ):
-            pytest.skip("Fichiers d'exemple non disponibles")
+class TestEndToEndWorkflow:
+    """Tests pour le workflow complet de l'application."""
 
-        # Parser les fichiers séparément
-        weather_parser = WeatherParser()
-        solar_parser = SolarParser()
+    def test_complete_processing_pipeline(self, sample_preview, sample_generated_files):
+        """Test le pipeline complet de traitement des données."""
+        # Exécuter la prévisualisation
+        preview_data = sample_preview(threshold=200.0, delta_t=7.0)
+
+        # Vérifier la structure des données de prévisualisation
+        assert isinstance(preview_data, PreviewData)
+        assert len(preview_data.facades) > 0
+        assert preview_data.total_data_points > 0
+
+        # Vérifier que certaines façades ont des ajustements
+        assert preview_data.total_adjustments > 0
+        assert any(count > 0 for count in preview_data.adjustments_by_facade.values())
+
+        # Vérifier les échantillons d'ajustement
+        assert len(preview_data.sample_adjustments) > 0
+        # La température ajustée dépasse l'originale de delta_t (7.0): une seule
+        # comparaison pour tous les échantillons
+        assert [
+            sample.adjusted_temp - sample.original_temp
+            for sample in preview_data.sample_adjustments
+        ] == pytest.approx([7.0] * len(preview_data.sample_adjustments))
+
+        # Vérifier les fichiers de sortie
+        _assert_dat_outputs(sample_generated_files, preview_data)
+
+        # Chaque fichier contient exactement les ajustements annoncés pour sa façade
+        for facade, generated_file in zip(preview_data.facades, sample_generated_files):
+            assert (
+                _count_adjusted_lines(generated_file, preview_data.weather_data)
+                == preview_data.adjustments_by_facade[facade]
+            )
 
-        _weather_header, weather_data = weather_parser.parse(sample_weather_file)
-        solar_data = solar_parser.parse(sample_solar_file)
+    def test_reference_values(self, sample_preview):
+        """Test les valeurs calculées pour les fichiers d'exemple (seuil 200, ΔT 7)."""
+        preview_data = sample_preview(threshold=200.0, delta_t=7.0)
+
+        # Nombre d'heures ajustées par façade: toute dérive du calcul les modifie
+        assert preview_data.adjustments_by_facade == {
+            "f2 Building body": 1002,
+            "f3 Building body": 1598,
+            "f4 Building body": 919,
+        }
+        assert preview_data.total_adjustments == 3519
+
+        # Statistiques des températures d'origine, à 0.01 °C près
+        temperatures = [point.temperature for point in preview_data.weather_data]
+        assert min(temperatures) == pytest.approx(-5.6, abs=0.01)
+        assert max(temperatures) == pytest.approx(35.4, abs=0.01)
+        assert sum(temperatures) / len(temperatures) == pytest.approx(12.01, abs=0.01)
+
+        # Irradiance maximale parmi les échantillons affichés
+        assert max(
+            sample.solar_irradiance for sample in preview_data.sample_adjustments
+        ) == pytest.approx(850.0, abs=0.01)
+
+    def test_data_synchronization(self, sample_weather_parsed, sample_solar_points, sample_preview):
+        """Test la synchronisation entre les données météo et solaires."""
+        # Fichiers parsés séparément (une seule fois pour la session)
+        _weather_header, weather_data = sample_weather_parsed
+        solar_data = sample_solar_points
 
         # Vérifier qu'on a des données
         assert len(weather_data) > 0
         assert len(solar_data) > 0
 
         # Exécuter le processus complet
-        processor = SoschuProcessor()
-        preview_data = processor.preview_adjustments(
-            weather_file=sample_weather_file,
-            solar_file=sample_solar_file,
-            threshold=200.0,
-            delta_t=7.0,
-        )
+        preview_data = sample_preview(threshold=200.0, delta_t=7.0)
+
+        # La prévisualisation porte sur les mêmes données que les parsers: une seule
+        # comparaison globale par série (l'année météo est reprise du fichier solaire)
+        assert preview_data.solar_data == solar_data
+        assert [point.raw_line for point in preview_data.weather_data] == [
+            point.raw_line for point in weather_data
+        ]
 
         # Vérifier que les données temporelles sont correctement alignées dans les échantillons
         for sample in preview_data.sample_adjustments:
@@ -111,134 +152,126 @@ class TestEndToEndWorkflow:
             if sample.weather_datetime_utc and sample.solar_datetime_utc:
                 # Calculer la différence en heures
                 time_diff = abs(
-                    (
-                        sample.weather_datetime_utc - sample.solar_datetime_utc
-                    ).total_seconds()
-                    / 3600
+                    (sample.weather_datetime_utc - sample.solar_datetime_utc).total_seconds() / 3600
                 )
                 # La différence devrait être minimale (idéalement moins d'une heure)
-                assert (
-                    time_diff <= 1.0
-                ), f"Écart temporel trop important: {time_diff} heures"
+                assert time_diff <= 1.0, f"Écart temporel trop important: {time_diff} heures"
 
 
 class TestScenarioSpecifiques:
     """Tests de différents scénarios spécifiques."""
 
-    def test_seuil_ajustement(self, sample_weather_file, sample_solar_file):
+    def test_seuil_ajustement(self, sample_inputs):
         """Test l'effet du seuil sur les ajustements de température."""
-        # Vérifier que les fichiers existent
-        if (
-            not Path(sample_weather_file).exists()
-            or not Path(sample_solar_file).exists()
-        ):
-            pytest.skip("Fichiers d'exemple non disponibles")
-
-        # Initialiser le processeur
-        processor = SoschuProcessor()
-
-        # Tester avec différentes valeurs de seuil
+        # Tester avec différentes valeurs de seuil, à partir des fichiers parsés
+        # une seule fois pour la session
         seuils = [50.0, 200.0, 500.0]
-        resultats = []
-
-        for seuil in seuils:
-            preview = processor.preview_adjustments(
-                weather_file=sample_weather_file,
-                solar_file=sample_solar_file,
-                threshold=seuil,
-                delta_t=7.0,
+        resultats = [
+            preview.total_adjustments
+            for preview in SoschuProcessor().preview_adjustments_from_parsed(
+                sample_inputs, seuils, [7.0]
             )
-            resultats.append(preview.total_adjustments)
+        ]
 
         # Vérifier que le nombre d'ajustements diminue lorsque le seuil augmente
-        assert (
-            resultats[0] >= resultats[1] >= resultats[2]
-        ), "Le nombre d'ajustements devrait diminuer avec l'augmentation du seuil"
+        assert resultats[0] >= resultats[1] >= resultats[2], (
+            "Le nombre d'ajustements devrait diminuer avec l'augmentation du seuil"
+        )
 
-    def test_delta_t_impact(self, sample_weather_file, sample_solar_file):
-        """Test l'impact du delta_t sur les ajustements de température."""
-        # Vérifier que les fichiers existent
-        if (
-            not Path(sample_weather_file).exists()
-            or not Path(sample_solar_file).exists()
-        ):
-            pytest.skip("Fichiers d'exemple non disponibles")
+    @pytest.mark.parametrize(
+        ("threshold", "expect_adjustments"),
+        [(50.0, True), (1000.0, False)],
+        ids=["seuil_bas", "seuil_haut"],
+    )
+    def test_threshold_scenario(self, sample_preview, tmp_path, threshold, expect_adjustments):
+        """Test la génération des fichiers pour un seuil bas et un seuil haut."""
+        preview_data = sample_preview(threshold=threshold, delta_t=7.0)
+        generated_files = SoschuProcessor().generate_files(preview_data, str(tmp_path))
 
-        # Initialiser le processeur
-        processor = SoschuProcessor()
+        # Un seuil supérieur à toute irradiance ne déclenche aucun ajustement
+        assert (preview_data.total_adjustments > 0) is expect_adjustments
+        _assert_dat_outputs(generated_files, preview_data)
 
-        # Tester avec une valeur fixe de seuil et deux valeurs de delta_t
-        preview1 = processor.preview_adjustments(
-            weather_file=sample_weather_file,
-            solar_file=sample_solar_file,
-            threshold=200.0,
-            delta_t=5.0,
-        )
-
-        preview2 = processor.preview_adjustments(
-            weather_file=sample_weather_file,
-            solar_file=sample_solar_file,
-            threshold=200.0,
-            delta_t=10.0,
+    def test_delta_t_impact(self, sample_inputs):
+        """Test l'impact du delta_t sur les ajustements de température."""
+        # Tester avec une valeur fixe de seuil et deux valeurs de delta_t,
+        # à partir des fichiers parsés une seule fois pour la session
+        preview1, preview2 = SoschuProcessor().preview_adjustments_from_parsed(
+            sample_inputs, [200.0], [5.0, 10.0]
         )
 
         # Vérifier que le nombre d'ajustements est identique (dépend uniquement du seuil)
         assert preview1.total_adjustments == preview2.total_adjustments
 
-        # Vérifier que la différence d'ajustement est bien appliquée
-        if preview1.sample_adjustments:
-            for i in range(min(3, len(preview1.sample_adjustments))):
-                sample1 = preview1.sample_adjustments[i]
-                sample2 = preview2.sample_adjustments[i]
-
-                # Même point mais delta_t différent
-                assert sample1.facade_id == sample2.facade_id
-                assert sample1.original_temp == sample2.original_temp
+        # Mêmes points, seul le delta_t diffère
+        assert [
+            (sample.facade_id, sample.weather_datetime_utc, sample.original_temp)
+            for sample in preview1.sample_adjustments
+        ] == [
+            (sample.facade_id, sample.weather_datetime_utc, sample.original_temp)
+            for sample in preview2.sample_adjustments
+        ]
 
-                # La différence entre ajusté et original devrait correspondre au delta_t
-                assert sample1.adjusted_temp - sample1.original_temp == pytest.approx(
-                    5.0
-                )
-                assert sample2.adjusted_temp - sample2.original_temp == pytest.approx(
-                    10.0
-                )
+        # La différence entre ajusté et original devrait correspondre au delta_t
+        for preview in (preview1, preview2):
+            assert [
+                sample.adjusted_temp - sample.original_temp for sample in preview.sample_adjustments
+            ] == pytest.approx([preview.delta_t] * len(preview.sample_adjustments))
 
 
+@pytest.mark.slow
 class TestPerformanceIntegration:
     """Tests de performance."""
 
-    def test_processing_time(self, sample_weather_file, sample_solar_file):
+    def test_processing_time(self, sample_weather_file, sample_solar_file, record_property):
         """Test que le processus s'exécute dans un temps raisonnable."""
-        # Vérifier que les fichiers existent
-        if (
-            not Path(sample_weather_file).exists()
-            or not Path(sample_solar_file).exists()
-        ):
-            pytest.skip("Fichiers d'exemple non disponibles")
-
         # Initialiser le processeur
         processor = SoschuProcessor()
 
-        # Mesurer le temps d'exécution
-        start_time = time.time()
-
-        # Exécuter la prévisualisation
+        # Mesurer le temps d'exécution (horloge monotone haute résolution),
+        # parsing des deux fichiers compris
+        start_ns = time.perf_counter_ns()
         preview_data = processor.preview_adjustments(
             weather_file=sample_weather_file,
             solar_file=sample_solar_file,
             threshold=200.0,
             delta_t=7.0,
         )
+        processing_time_ns = time.perf_counter_ns() - start_ns
 
-        end_time = time.time()
-        processing_time = end_time - start_time
+        # Exposer la mesure dans le rapport JUnit (voir aussi `pytest --durations=10`)
+        record_property("processing_time", processing_time_ns / 1e9)
+        record_property("total_data_points", preview_data.total_data_points)
 
         # Vérifier que le traitement s'est fait dans un temps raisonnable
-        assert (
-            processing_time < 30.0
-        ), f"Temps de traitement trop long: {processing_time:.2f} secondes"
-        print(
-            f"Temps de traitement: {processing_time:.2f} secondes pour {preview_data.total_data_points} points de données"
+        assert processing_time_ns < _PROCESSING_TIME_BUDGET_NS, (
+            f"Temps de traitement trop long: {processing_time_ns / 1e9:.2f} secondes"
+        )
+
+    def test_processing_memory(
+        self, sample_weather_file, sample_solar_file, tmp_path, record_property
+    ):
+        """Test que la mémoire allouée par le traitement reste bornée."""
+        # Mesurer un traitement complet, parsing du fichier solaire compris
+        processor = SoschuProcessor()
+
+        tracemalloc.start()
+        try:
+            preview_data = processor.preview_adjustments(
+                weather_file=sample_weather_file,
+                solar_file=sample_solar_file,
+                threshold=200.0,
+                delta_t=7.0,
+            )
+            processor.generate_files(preview_data, str(tmp_path))
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        record_property("peak_memory_bytes", peak_memory)
+
+        assert peak_memory < _PEAK_MEMORY_BUDGET, (
+            f"Pic mémoire trop élevé: {peak_memory / 1024 / 1024:.1f} Mo"
         )
 
 
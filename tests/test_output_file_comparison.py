@@ -6,131 +6,112 @@ de référence validés manuellement.
 """
 
 import filecmp
-import tempfile
+import itertools
 from pathlib import Path
 
 import pytest
 
-from core import SoschuProcessor
-
+# Fichiers de référence, listés à la collecte: un cas de comparaison par façade
+_REFERENCE_OUTPUT_DIR = Path(__file__).parent / "data" / "outputs"
+_REFERENCE_FILE_NAMES = sorted(p.name for p in _REFERENCE_OUTPUT_DIR.glob("*.dat"))
+
+# Taille des blocs binaires comparés pour localiser une différence
+_COMPARE_BLOCK_SIZE = 64 * 1024
+
+
+def _first_differing_line(gen_file: Path, ref_file: Path) -> int:
+    """
+    Renvoie le numéro (à partir de 1) de la première ligne qui diffère entre deux
+    fichiers différents, en les comparant par blocs binaires.
+    """
+    line_number = 1
+    with gen_file.open("rb") as gen_f, ref_file.open("rb") as ref_f:
+        while True:
+            gen_block = gen_f.read(_COMPARE_BLOCK_SIZE)
+            ref_block = ref_f.read(_COMPARE_BLOCK_SIZE)
+            if gen_block != ref_block or not gen_block:
+                break
+            # Blocs identiques: seules les fins de ligne sont comptées
+            line_number += gen_block.count(b"\n")
+
+    # Premier octet différent, ou fin du fichier le plus court
+    offset = next(
+        (i for i, (gen, ref) in enumerate(zip(gen_block, ref_block)) if gen != ref),
+        min(len(gen_block), len(ref_block)),
+    )
+    return line_number + gen_block.count(b"\n", 0, offset)
 
-@pytest.fixture
-def sample_weather_file():
-    """Fixture pour un fichier météo de test."""
-    return str(Path(__file__).parent / "data" / "TRY2045_488284093163_Jahr.dat")
 
+def _read_line(file_path: Path, line_number: int) -> str:
+    """Renvoie la ligne `line_number` (à partir de 1) d'un fichier .dat, ou ''."""
+    with file_path.open(encoding="iso-8859-1", newline="") as f:
+        return next(itertools.islice(f, line_number - 1, None), "")
 
-@pytest.fixture
-def sample_solar_file():
-    """Fixture pour un fichier solaire de test."""
-    return str(
-        Path(__file__).parent / "data" / "Solare Einstrahlung auf die Fassade.html"
-    )
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def reference_output_dir():
     """Chemin vers le répertoire contenant les fichiers de sortie de référence."""
-    return str(Path(__file__).parent / "data" / "outputs")
+    return str(_REFERENCE_OUTPUT_DIR)
 
 
+@pytest.mark.integration
+@pytest.mark.usefixtures("require_sample_files")
 class TestOutputFileComparison:
     """Tests de comparaison des fichiers de sortie."""
 
-    @pytest.mark.integration
     def test_generated_files_match_reference(
-        self, sample_weather_file, sample_solar_file, reference_output_dir
+        self,
+        sample_weather_file,
+        sample_solar_file,
+        reference_output_dir,
+        sample_generated_files,
     ):
-        """Vérifie que les fichiers générés correspondent aux fichiers de référence."""
+        """Vérifie qu'un fichier est généré pour chaque fichier de référence."""
         # Vérifier que les fichiers d'entrée existent
-        assert Path(
-            sample_weather_file
-        ).exists(), "Le fichier météo d'exemple n'existe pas"
-        assert Path(
-            sample_solar_file
-        ).exists(), "Le fichier solaire d'exemple n'existe pas"
+        assert Path(sample_weather_file).exists(), "Le fichier météo d'exemple n'existe pas"
+        assert Path(sample_solar_file).exists(), "Le fichier solaire d'exemple n'existe pas"
 
         # Vérifier que le répertoire de référence existe
-        assert Path(
-            reference_output_dir
-        ).exists(), "Le répertoire de référence n'existe pas"
-
-        # Initialiser le processeur
-        processor = SoschuProcessor()
-
-        # Créer un répertoire temporaire pour les fichiers de sortie générés
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Générer les données de prévisualisation
-            preview_data = processor.preview_adjustments(
-                weather_file=sample_weather_file,
-                solar_file=sample_solar_file,
-                threshold=200.0,
-                delta_t=7.0,
-            )
-
-            # Générer les fichiers
-            generated_files = processor.generate_files(preview_data, temp_dir)
-
-            # Vérifier que des fichiers ont été générés
-            assert len(generated_files) > 0, "Aucun fichier n'a été généré"
-
-            # Lister les fichiers de référence
-            reference_files = [
-                str(p) for p in Path(reference_output_dir).glob("*") if p.is_file()
-            ]
-
-            # Vérifier que le nombre de fichiers générés correspond au nombre de fichiers de référence
-            assert len(generated_files) == len(reference_files), (
-                f"Le nombre de fichiers générés ({len(generated_files)}) ne correspond pas "
-                f"au nombre de fichiers de référence ({len(reference_files)})"
+        assert Path(reference_output_dir).exists(), "Le répertoire de référence n'existe pas"
+
+        # Fichiers générés une seule fois pour la session (seuil 200, delta T 7)
+        generated_files = sample_generated_files
+
+        # Vérifier que des fichiers ont été générés
+        assert len(generated_files) > 0, "Aucun fichier n'a été généré"
+
+        # Vérifier que les fichiers générés et les fichiers de référence se correspondent
+        generated_names = sorted(Path(p).name for p in generated_files)
+        assert generated_names == _REFERENCE_FILE_NAMES, (
+            f"Les fichiers générés ({generated_names}) ne correspondent pas "
+            f"aux fichiers de référence ({_REFERENCE_FILE_NAMES})"
+        )
+
+    @pytest.mark.parametrize("file_name", _REFERENCE_FILE_NAMES)
+    def test_generated_file_content_matches_reference(self, file_name, sample_generated_files):
+        """Vérifie qu'un fichier généré est identique à son fichier de référence."""
+        generated_by_name = {Path(p).name: Path(p) for p in sample_generated_files}
+        assert file_name in generated_by_name, (
+            f"Aucun fichier généré ne correspond à la référence {file_name}"
+        )
+
+        gen_file = generated_by_name[file_name]
+        ref_file = _REFERENCE_OUTPUT_DIR / file_name
+
+        # Comparer les deux fichiers
+        are_identical = filecmp.cmp(gen_file, ref_file, shallow=False)
+
+        # En cas d'échec, indiquer la première ligne qui diffère
+        if not are_identical:
+            diff_line_num = _first_differing_line(gen_file, ref_file)
+            pytest.fail(
+                f"Fichier {file_name} diffère du fichier de référence"
+                f" à la ligne {diff_line_num}\n"
+                f"  attendu: {_read_line(ref_file, diff_line_num)!r}\n"
+                f"  obtenu:  {_read_line(gen_file, diff_line_num)!r}"
             )
 
-            # Pour chaque fichier généré, trouver son correspondant dans les fichiers de référence et comparer
-            for gen_file_path in generated_files:
-                gen_file_name = Path(gen_file_path).name
-                ref_file_path = str(Path(reference_output_dir) / gen_file_name)
-
-                # Vérifier que le fichier de référence correspondant existe
-                assert Path(
-                    ref_file_path
-                ).exists(), f"Le fichier de référence correspondant à {gen_file_name} n'existe pas"
-
-                # Comparer les deux fichiers
-                are_identical = filecmp.cmp(gen_file_path, ref_file_path, shallow=False)
-
-                # En cas d'échec, afficher les différences
-                if not are_identical:
-                    # Lire les deux fichiers pour trouver les différences
-                    with (
-                        Path(gen_file_path).open(encoding="iso-8859-1") as gen_file,
-                        Path(ref_file_path).open(encoding="iso-8859-1") as ref_file,
-                    ):
-                        gen_lines = gen_file.readlines()
-                        ref_lines = ref_file.readlines()
-
-                        # Trouver la première différence
-                        diff_line_num = None
-                        for i, (gen_line, ref_line) in enumerate(
-                            zip(gen_lines, ref_lines)
-                        ):
-                            if gen_line != ref_line:
-                                diff_line_num = i + 1
-                                break
-
-                        if diff_line_num is None and len(gen_lines) != len(ref_lines):
-                            diff_line_num = min(len(gen_lines), len(ref_lines)) + 1
-
-                        message = (
-                            f"Fichier {gen_file_name} diffère du fichier de référence"
-                        )
-                        if diff_line_num is not None:
-                            message += f" à la ligne {diff_line_num}"
-
-                        pytest.fail(message)
-
-                assert (
-                    are_identical
-                ), f"Le fichier {gen_file_name} diffère du fichier de référence"
+        assert are_identical, f"Le fichier {file_name} diffère du fichier de référence"
 
 
 if __name__ == "__main__":
@@ -4,11 +4,7 @@ Tests unitaires pour le module parser.py
 Ce module teste les classes WeatherParser et SolarParser.
 """
 
-import tempfile
 from parser import SolarParser, WeatherParser
-from pathlib import Path
-
-import pytest
 
 
 class TestWeatherParser:
@@ -19,80 +15,62 @@ class TestWeatherParser:
         parser = WeatherParser()
         assert parser is not None
 
-    @pytest.mark.skip(reason="Problème de parsing du fichier temporaire")
-    def test_parse_simple_weather_data(self):
+    def test_parse_simple_weather_data(self, tmp_path):
         """Test le parsing d'un fichier météo simple."""
         # Créer un fichier météo temporaire minimal
-        with tempfile.NamedTemporaryFile(
-            mode="w", encoding="iso-8859-1", delete=False
-        ) as temp_file:
-            temp_file.write(
-                """Testfile: Simple weather data
-Format: M D H Ta
-Format details: Month Day Hour Temperature
+        temp_path = tmp_path / "weather.dat"
+        temp_path.write_text(
+            """Testfile: Simple weather data
+     RW      HW MM DD HH     t    p  WR   WG N    x  RF    B    D   A    E IL
 ***
-01 01 01 10.5
-01 01 02 11.2
-01 01 03 12.0
-"""
-            )
-            temp_path = temp_file.name
-
-        try:
-            # Analyser le fichier
-            parser = WeatherParser()
-            header, data_points = parser.parse(temp_path)
-
-            # Vérifier les résultats
-            assert "Testfile: Simple weather data" in header
-            assert len(data_points) == 3
-
-            # Vérifier le premier point
-            point1 = data_points[0]
-            assert point1.month == 1
-            assert point1.day == 1
-            assert point1.hour == 1
-            assert point1.temperature == 10.5
-            assert point1.year == 2045  # Valeur par défaut
-
-            # Vérifier le dernier point
-            point3 = data_points[2]
-            assert point3.month == 1
-            assert point3.day == 1
-            assert point3.hour == 3
-            assert point3.temperature == 12.0
-
-        finally:
-            # Nettoyer
-            Path(temp_path).unlink()
-
-    @pytest.mark.skip(reason="Problème de parsing du fichier temporaire")
-    def test_parse_with_custom_year(self):
+3951500 2459500  1  1  1  10.5  987 208  1.6 7  6.4  95    0    0 345 -354  1
+3951500 2459500  1  1  2  11.2  987 207  1.9 7  6.9  96    0    0 346 -355  1
+3951500 2459500  1  1  3  12.0  987 207  2.0 7  7.0  96    0    0 346 -355  1
+""",
+            encoding="iso-8859-1",
+        )
+
+        # Analyser le fichier
+        parser = WeatherParser()
+        header, data_points = parser.parse(str(temp_path))
+
+        # Vérifier les résultats
+        assert "Testfile: Simple weather data" in header
+        assert len(data_points) == 3
+
+        # Vérifier le premier point
+        point1 = data_points[0]
+        assert point1.month == 1
+        assert point1.day == 1
+        assert point1.hour == 1
+        assert point1.temperature == 10.5
+        assert point1.year == 2045  # Valeur par défaut
+
+        # Vérifier le dernier point
+        point3 = data_points[2]
+        assert point3.month == 1
+        assert point3.day == 1
+        assert point3.hour == 3
+        assert point3.temperature == 12.0
+
+    def test_parse_with_custom_year(self, tmp_path):
         """Test le parsing avec spécification d'une année personnalisée."""
         # Créer un fichier météo temporaire minimal
-        with tempfile.NamedTemporaryFile(
-            mode="w", encoding="iso-8859-1", delete=False
-        ) as temp_file:
-            temp_file.write(
-                """Testfile: Weather data with custom year
-Format: M D H Ta
+        temp_path = tmp_path / "weather.dat"
+        temp_path.write_text(
+            """Testfile: Weather data with custom year
 ***
-01 01 01 10.5
-"""
-            )
-            temp_path = temp_file.name
+3951500 2459500  1  1  1  10.5  987 208  1.6 7  6.4  95    0    0 345 -354  1
+""",
+            encoding="iso-8859-1",
+        )
 
-        try:
-            # Analyser le fichier avec année spécifique
-            parser = WeatherParser()
-            _header, data_points = parser.parse(temp_path, year=2023)
-
-            # Vérifier que l'année a été correctement assignée
-            assert data_points[0].year == 2023
+        # Analyser le fichier avec année spécifique
+        parser = WeatherParser()
+        _header, data_points = parser.parse(str(temp_path), year=2023)
 
-        finally:
-            # Nettoyer
-            Path(temp_path).unlink()
+        # Vérifier que l'année a été correctement assignée
+        assert data_points[0].year == 2023
 
 
 class TestSolarParser:
@@ -103,131 +81,93 @@ class TestSolarParser:
         parser = SolarParser()
         assert parser is not None
 
-    @pytest.mark.skip(reason="Problème de parsing du fichier temporaire")
-    def test_parse_simple_solar_html(self):
+    def test_parse_simple_solar_html(self, tmp_path):
         """Test le parsing d'un fichier HTML solaire simple."""
-        # Créer un fichier HTML solaire minimal
+        # Créer un fichier HTML solaire minimal, structuré comme l'export (une cellule
+        # par ligne, une valeur par façade)
         html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Solare Einstrahlung</title></head>
-        <body>
-            <h1>Solare Einstrahlung auf die Fassade</h1>
-            <table>
-                <tr>
-                    <th>Datum</th>
-                    <th>f2 - Building body</th>
-                    <th>f3 - Building body</th>
-                    <th>f4 - Building body</th>
-                </tr>
-                <tr>
-                    <td>01.01.2045 00:00 MEZ</td>
-                    <td>0.0</td>
-                    <td>0.0</td>
-                    <td>0.0</td>
-                </tr>
-                <tr>
-                    <td>01.01.2045 01:00 MEZ</td>
-                    <td>0.0</td>
-                    <td>0.0</td>
-                    <td>0.0</td>
-                </tr>
-                <tr>
-                    <td>01.06.2045 12:00 MESZ</td>
-                    <td>750.5</td>
-                    <td>250.3</td>
-                    <td>100.1</td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        with tempfile.NamedTemporaryFile(
-            mode="w", encoding="utf-8", delete=False, suffix=".html"
-        ) as temp_file:
-            temp_file.write(html_content)
-            temp_path = temp_file.name
-
-        try:
-            # Analyser le fichier
-            parser = SolarParser()
-            solar_points = parser.parse(temp_path)
-
-            # Vérifier les résultats
-            assert len(solar_points) == 3
-
-            # Vérifier premier point (heure d'hiver)
-            first_point = solar_points[0]
-            assert first_point.month == 1
-            assert first_point.day == 1
-            assert first_point.hour == 0
-            assert first_point.is_dst is False
-            assert first_point.irradiance_by_facade["f2"] == 0.0
-            assert first_point.irradiance_by_facade["f3"] == 0.0
-
-            # Vérifier dernier point (heure d'été)
-            last_point = solar_points[2]
-            assert last_point.month == 6
-            assert last_point.day == 1
-            assert last_point.hour == 12
-            assert last_point.is_dst is True
-            assert last_point.irradiance_by_facade["f2"] == 750.5
-            assert last_point.irradiance_by_facade["f3"] == 250.3
-            assert last_point.irradiance_by_facade["f4"] == 100.1
-
-        finally:
-            # Nettoyer
-            Path(temp_path).unlink()
-
-    @pytest.mark.skip(reason="Problème de parsing du fichier temporaire")
-    def test_parse_missing_data(self):
+  <table class=rep border=1 BORDERCOLOR="#000000">
+    <tr>
+      <td rowspan=2>Stunde
+      <td colspan=3>Variablen
+    <tr>
+      <td>Gesamte solare Einstrahlung, f2$Building body, W/m2
+      <td>Gesamte solare Einstrahlung, f3$Building body, W/m2
+      <td>Gesamte solare Einstrahlung, f4$Building body, W/m2
+    <tr>
+      <td class=value>01.01.2045 00:00
+      <td class=value>0.0
+      <td class=value>0.0
+      <td class=value>0.0
+    <tr>
+      <td class=value>01.01.2045 01:00
+      <td class=value>0.0
+      <td class=value>0.0
+      <td class=value>0.0
+    <tr>
+      <td class=value>01.06.2045 12:00
+      <td class=value>750.5
+      <td class=value>250.3
+      <td class=value>100.1
+  </table>
+"""
+        temp_path = tmp_path / "solar.html"
+        temp_path.write_text(html_content, encoding="utf-8")
+
+        # Analyser le fichier
+        parser = SolarParser()
+        solar_points = parser.parse(str(temp_path))
+
+        # Vérifier les résultats
+        assert len(solar_points) == 3
+
+        # Vérifier premier point (heure d'hiver)
+        first_point = solar_points[0]
+        assert first_point.month == 1
+        assert first_point.day == 1
+        assert first_point.hour == 0
+        assert first_point.is_dst is False
+        assert first_point.irradiance_by_facade["f2 Building body"] == 0.0
+        assert first_point.irradiance_by_facade["f3 Building body"] == 0.0
+
+        # Vérifier dernier point (heure d'été)
+        last_point = solar_points[2]
+        assert last_point.month == 6
+        assert last_point.day == 1
+        assert last_point.hour == 12
+        assert last_point.is_dst is True
+        assert last_point.irradiance_by_facade["f2 Building body"] == 750.5
+        assert last_point.irradiance_by_facade["f3 Building body"] == 250.3
+        assert last_point.irradiance_by_facade["f4 Building body"] == 100.1
+
+    def test_parse_missing_data(self, tmp_path):
         """Test que le parser gère correctement les données manquantes."""
         # Créer un fichier HTML solaire avec des valeurs manquantes
         html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Solare Einstrahlung</title></head>
-        <body>
-            <h1>Solare Einstrahlung auf die Fassade</h1>
-            <table>
-                <tr>
-                    <th>Datum</th>
-                    <th>f2 - Building body</th>
-                </tr>
-                <tr>
-                    <td>01.01.2045 00:00 MEZ</td>
-                    <td>0.0</td>
-                </tr>
-                <tr>
-                    <td>Fehlerhafte Zeile</td>
-                    <td>N/A</td>
-                </tr>
-                <tr>
-                    <td>01.06.2045 12:00 MESZ</td>
-                    <td>750.5</td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        with tempfile.NamedTemporaryFile(
-            mode="w", encoding="utf-8", delete=False, suffix=".html"
-        ) as temp_file:
-            temp_file.write(html_content)
-            temp_path = temp_file.name
-
-        try:
-            # Analyser le fichier
-            parser = SolarParser()
-            solar_points = parser.parse(temp_path)
-
-            # Vérifier qu'on n'a que 2 points valides (la ligne erronée est ignorée)
-            assert len(solar_points) == 2
-
-            # Vérifier premier et dernier point
-            assert solar_points[0].hour == 0
-            assert solar_points[1].hour == 12
-
-        finally:
-            # Nettoyer
-            Path(temp_path).unlink()
+  <table class=rep border=1 BORDERCOLOR="#000000">
+    <tr>
+      <td>Gesamte solare Einstrahlung, f2$Building body, W/m2
+    <tr>
+      <td class=value>01.01.2045 00:00
+      <td class=value>0.0
+    <tr>
+      <td class=value>Fehlerhafte Zeile
+      <td class=value>N/A
+    <tr>
+      <td class=value>01.06.2045 12:00
+      <td class=value>750.5
+  </table>
+"""
+        temp_path = tmp_path / "solar.html"
+        temp_path.write_text(html_content, encoding="utf-8")
+
+        # Analyser le fichier
+        parser = SolarParser()
+        solar_points = parser.parse(str(temp_path))
+
+        # Vérifier qu'on n'a que 2 points valides (la ligne erronée est ignorée)
+        assert len(solar_points) == 2
+
+        # Vérifier premier et dernier point
+        assert solar_points[0].hour == 0
+        assert solar_points[1].hour == 12
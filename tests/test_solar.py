@@ -4,9 +4,11 @@ Tests unitaires pour le module solar.py
 Ce module teste la classe SolarPoint et ses méthodes associées.
 """
 
-from datetime import timezone
+from datetime import datetime, timedelta, timezone
 
-from solar import SolarPoint
+import pytest
+
+from solar import SolarPoint, is_summer_time
 
 
 class TestSolarPoint:
@@ -48,9 +50,7 @@ class TestSolarPoint:
         dt_utc = solar_point.to_datetime_utc()
 
         # En été : MESZ = UTC+2, donc 14:00 MESZ = 12:00 UTC
-        # Mais il peut y avoir des variations selon la version du système ou de pytz
-        # On accepte une différence d'une heure
-        assert dt_utc.hour in [12, 13]
+        assert dt_utc.hour == 12
         assert dt_utc.tzinfo == timezone.utc
 
     def test_to_datetime_utc_without_dst(self):
@@ -95,3 +95,56 @@ class TestSolarPoint:
             year=2045,
         )
         assert winter_point.get_original_datetime_str() == "15.01.2045 14:00 MEZ"
+
+    @pytest.mark.parametrize(
+        ("month", "day", "hour", "is_dst"),
+        [
+            (1, 15, 14, False),
+            (6, 15, 14, True),
+            # Minuit local: l'heure UTC tombe la veille
+            (1, 1, 0, False),
+            (7, 1, 1, True),
+        ],
+    )
+    def test_utc_hour_matches_datetime_utc(self, month, day, hour, is_dst):
+        """Test que la clé horaire précalculée correspond à la conversion UTC."""
+        solar_point = SolarPoint(
+            month=month,
+            day=day,
+            hour=hour,
+            irradiance_by_facade={},
+            is_dst=is_dst,
+            year=2023,
+        )
+
+        # Conversion de référence: heure locale avec décalage fixe MEZ/MESZ
+        offset = timezone(timedelta(hours=2 if is_dst else 1))
+        expected = datetime(2023, month, day, hour, tzinfo=offset).astimezone(timezone.utc)
+
+        assert solar_point.utc_hour == expected.toordinal() * 24 + expected.hour
+        assert solar_point.to_datetime_utc() == expected
+
+
+class TestSummerTime:
+    """Tests pour la détection de l'heure d'été (MESZ)."""
+
+    @pytest.mark.parametrize(
+        ("year", "month", "day", "hour", "expected"),
+        [
+            (2023, 1, 15, 12, False),
+            (2023, 6, 15, 12, True),
+            # Passage à l'heure d'été le dernier dimanche de mars (02:00 -> 03:00)
+            (2023, 3, 26, 1, False),
+            (2023, 3, 26, 3, True),
+            # Retour à l'heure d'hiver le dernier dimanche d'octobre (03:00 -> 02:00)
+            (2023, 10, 29, 1, True),
+            (2023, 10, 29, 2, False),
+            # Années bissextiles et postérieures à 2037
+            (2024, 3, 31, 3, True),
+            (2024, 10, 27, 2, False),
+            (2045, 7, 1, 0, True),
+        ],
+    )
+    def test_is_summer_time(self, year, month, day, hour, expected):
+        """Test les bornes de l'heure d'été en heure locale."""
+        assert is_summer_time(year, month, day, hour) is expected
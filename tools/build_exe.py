@@ -37,7 +37,6 @@ def build_native_macos(
         exe_name,
         "--add-data",
         f"{project_root}/src:src",
-        "--hidden-import=pytz",
         "--hidden-import=lxml",
         str(entrypoint),
     ]
@@ -104,7 +103,6 @@ def build_native_windows(
         exe_name,
         "--add-data",
         add_data_param,
-        "--hidden-import=pytz",
         "--hidden-import=lxml",
         str(entrypoint),
     ]
@@ -166,7 +164,7 @@ a = Analysis(['{entrypoint.as_posix()}'],
              datas=[
                 ('{project_root.as_posix()}/src', 'src')
              ],
-             hiddenimports=['pytz', 'lxml'],
+             hiddenimports=['lxml'],
              hookspath=[],
              runtime_hooks=[],
              excludes=[],